@@ -1,9 +1,8 @@
 import tkinter as tk
 import random
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import List, Tuple, Optional, Dict
-import copy
 
 # Constantes
 BLOCK_SIZE = 30
@@ -69,6 +68,14 @@ SHAPES = {
     ]
 }
 
+# Grille figée : tuple de rangées, elles-mêmes des tuples (None = case vide)
+Grid = Tuple[Tuple[Optional[str], ...], ...]
+EMPTY_ROW = (None,) * GRID_WIDTH  # Partagée par toutes les grilles figées
+
+def shape_blocks(shape_type, rotation, x, y) -> List[Tuple[int, int]]:
+    shape = SHAPES[shape_type][rotation % len(SHAPES[shape_type])]
+    return [(x + dx, y + dy) for dx, dy in shape]
+
 # Classe pour représenter une pièce
 @dataclass
 class Piece:
@@ -79,8 +86,7 @@ class Piece:
     is_special: bool = False
     
     def get_blocks(self) -> List[Tuple[int, int]]:
-        shape = SHAPES[self.shape_type][self.rotation % len(SHAPES[self.shape_type])]
-        return [(self.x + dx, self.y + dy) for dx, dy in shape]
+        return shape_blocks(self.shape_type, self.rotation, self.x, self.y)
     
     def rotate(self):
         self.rotation = (self.rotation + 1) % len(SHAPES[self.shape_type])
@@ -89,10 +95,241 @@ class Piece:
         self.x += dx
         self.y += dy
 
+# Fonctions pures sur les grilles, utilisées par les instantanés et par l'IA
+def freeze_grid(grid, previous: Optional[Grid] = None) -> Grid:
+    # Réutiliser les rangées identiques à l'instantané précédent (partage de structure)
+    rows = []
+    for y, row in enumerate(grid):
+        frozen = tuple(row)
+        if frozen == EMPTY_ROW:
+            frozen = EMPTY_ROW
+        elif previous is not None and previous[y] == frozen:
+            frozen = previous[y]
+        rows.append(frozen)
+    return tuple(rows)
+
+def grid_collides(grid, blocks) -> bool:
+    for x, y in blocks:
+        if x < 0 or x >= GRID_WIDTH or y >= GRID_HEIGHT:
+            return True
+        if y >= 0 and grid[y][x]:  # Ignorer les collisions au-dessus de la grille
+            return True
+    return False
+
+def landing_y(grid, piece) -> int:
+    # Position verticale finale d'une pièce lâchée depuis sa position actuelle
+    y = piece.y
+    while not grid_collides(grid, shape_blocks(piece.shape_type, piece.rotation, piece.x, y + 1)):
+        y += 1
+    return y
+
+def place_blocks(grid, blocks, color) -> Grid:
+    # Seules les rangées touchées par la pièce sont copiées
+    rows = list(grid)
+    for x, y in blocks:
+        if 0 <= y < GRID_HEIGHT and 0 <= x < GRID_WIDTH:
+            row = list(rows[y])
+            row[x] = color
+            rows[y] = tuple(row)
+    return tuple(rows)
+
+def clear_full_lines(grid) -> Tuple[Grid, int]:
+    kept = tuple(row for row in grid if not all(row))
+    lines_cleared = GRID_HEIGHT - len(kept)
+    return (EMPTY_ROW,) * lines_cleared + kept, lines_cleared
+
+def line_clear_points(lines_cleared) -> int:
+    if lines_cleared == 1:
+        return 50
+    elif lines_cleared == 2:
+        return 50 * 2 + 100  # 200 points
+    elif lines_cleared == 3:
+        return 50 * 3 + 200  # 350 points
+    elif lines_cleared == 4:
+        return 50 * 4 + 300  # 500 points
+    return 0
+
+# État figé d'une pièce, pour les instantanés
+@dataclass(frozen=True)
+class PieceState:
+    shape_type: str
+    rotation: int
+    x: int
+    y: int
+    is_special: bool = False
+
+    @classmethod
+    def from_piece(cls, piece: Optional[Piece]) -> Optional['PieceState']:
+        if piece is None:
+            return None
+        return cls(piece.shape_type, piece.rotation, piece.x, piece.y, piece.is_special)
+
+    def to_piece(self) -> Piece:
+        return Piece(self.shape_type, self.rotation, self.x, self.y, self.is_special)
+
+    def get_blocks(self) -> List[Tuple[int, int]]:
+        return shape_blocks(self.shape_type, self.rotation, self.x, self.y)
+
+# État figé de la grille d'un joueur
+@dataclass(frozen=True)
+class BoardState:
+    grid: Grid
+    current: Optional[PieceState]
+    next: Optional[PieceState]
+    score: int
+    lines_cleared: int
+
+# Instantané immuable de toute la partie. Les rangées inchangées sont partagées
+# entre instantanés, ce qui rend la capture et l'exploration de coups peu coûteuses.
+@dataclass(frozen=True)
+class GameSnapshot:
+    human: BoardState
+    ai: BoardState
+    game_over: bool
+    rainbow_mode: bool
+    rainbow_end_time: float
+    slow_mode: bool
+    slow_end_time: float
+    fall_speed: float
+    fall_speed_ai: float
+
+    def board(self, player) -> BoardState:
+        return self.human if player == 'human' else self.ai
+
+    def apply_move(self, player, rotation, x) -> Optional['GameSnapshot']:
+        # Joue un coup (rotation + colonne puis chute) sur une copie de l'état.
+        # Retourne None si le coup est impossible. Les effets aléatoires ou liés
+        # au temps (pièce facile pour l'adversaire, pièces rigolotes, pause
+        # douceur) ne sont pas simulés, et la pièce suivante devient inconnue.
+        board = self.board(player)
+        if self.game_over or board.current is None:
+            return None
+
+        piece = replace(board.current, rotation=rotation % len(SHAPES[board.current.shape_type]), x=x)
+        if grid_collides(board.grid, piece.get_blocks()):
+            return None
+        piece = replace(piece, y=landing_y(board.grid, piece))
+
+        grid = place_blocks(board.grid, piece.get_blocks(), COLORS[piece.shape_type])
+        grid, lines_cleared = clear_full_lines(grid)
+
+        points = line_clear_points(lines_cleared)
+        if lines_cleared > 0 and piece.is_special:
+            points += 100  # Bonus pour pièce spéciale bien placée
+
+        next_piece = None
+        if board.next:
+            next_piece = replace(board.next, x=GRID_WIDTH // 2 - 2, y=0)
+
+        board = BoardState(grid, next_piece, None, board.score + points,
+                           board.lines_cleared + lines_cleared)
+        return replace(self, game_over=any(grid[0]), **{player: board})
+
+# Moteurs de rendu : le jeu décrit les cellules à afficher, le moteur les dessine
+class Renderer:
+    def draw_board(self, canvas, cells: Dict[Tuple[int, int], str]):
+        # cells associe (x, y) à la couleur de chaque bloc visible de la grille
+        raise NotImplementedError
+
+    def draw_preview(self, canvas, key: str, cells: Dict[Tuple[int, int], str],
+                     origin_x: float, origin_y: float, block_size: float):
+        # Dessine une pièce en miniature ; key identifie l'emplacement (un par joueur)
+        raise NotImplementedError
+
+# Rendu classique : un rectangle de canvas par bloc
+class CanvasRenderer(Renderer):
+    def draw_board(self, canvas, cells):
+        canvas.delete("all")
+
+        for (x, y), color in cells.items():
+            x1 = x * BLOCK_SIZE
+            y1 = y * BLOCK_SIZE
+            canvas.create_rectangle(x1, y1, x1 + BLOCK_SIZE, y1 + BLOCK_SIZE,
+                                    fill=color, outline="white")
+
+    def draw_preview(self, canvas, key, cells, origin_x, origin_y, block_size):
+        for (dx, dy), color in cells.items():
+            x1 = origin_x + dx * block_size
+            y1 = origin_y + dy * block_size
+            canvas.create_rectangle(x1, y1, x1 + block_size, y1 + block_size,
+                                    fill=color, outline="white")
+
+# Rendu dans une image : chaque grille est une seule PhotoImage affichée par un
+# unique élément du canvas, on n'y recopie que les cases qui ont changé
+class PhotoImageRenderer(Renderer):
+    EMPTY_COLOR = "black"
+    PREVIEW_CELLS = 4  # Les pièces tiennent toutes dans un carré de 4x4 blocs
+
+    def __init__(self):
+        self.tiles = {}     # (taille, couleur) -> PhotoImage du bloc pré-rendu
+        self.boards = {}    # canvas -> PhotoImage de la grille
+        self.shown = {}     # canvas -> couleurs actuellement affichées
+        self.previews = {}  # key -> PhotoImage de la prochaine pièce
+
+    def get_tile(self, canvas, size, color):
+        tile = self.tiles.get((size, color))
+        if tile is None:
+            tile = tk.PhotoImage(master=canvas, width=size, height=size)
+            tile.put(color, to=(0, 0, size, size))
+            if color != self.EMPTY_COLOR:
+                # Bordure blanche comme pour les rectangles du canvas
+                tile.put("white", to=(0, 0, size, 1))
+                tile.put("white", to=(0, size - 1, size, size))
+                tile.put("white", to=(0, 0, 1, size))
+                tile.put("white", to=(size - 1, 0, size, size))
+            self.tiles[(size, color)] = tile
+        return tile
+
+    def blit(self, image, tile, x, y):
+        # Copie native Tk d'une image dans une autre, sans passer par Python pixel par pixel
+        image.tk.call(image.name, "copy", tile.name, "-to", x, y)
+
+    def draw_board(self, canvas, cells):
+        image = self.boards.get(canvas)
+        if image is None:
+            image = tk.PhotoImage(master=canvas, width=GRID_WIDTH * BLOCK_SIZE,
+                                  height=GRID_HEIGHT * BLOCK_SIZE)
+            canvas.create_image(0, 0, image=image, anchor="nw")
+            self.boards[canvas] = image
+            # Forcer le premier dessin de toutes les cases
+            self.shown[canvas] = [[False] * GRID_WIDTH for _ in range(GRID_HEIGHT)]
+
+        shown = self.shown[canvas]
+        for y in range(GRID_HEIGHT):
+            row = shown[y]
+            for x in range(GRID_WIDTH):
+                color = cells.get((x, y), self.EMPTY_COLOR)
+                if row[x] != color:
+                    row[x] = color
+                    self.blit(image, self.get_tile(canvas, BLOCK_SIZE, color),
+                              x * BLOCK_SIZE, y * BLOCK_SIZE)
+
+    def draw_preview(self, canvas, key, cells, origin_x, origin_y, block_size):
+        size = int(round(block_size))
+        image = self.previews.get(key)
+        if image is None:
+            image = tk.PhotoImage(master=canvas, width=size * self.PREVIEW_CELLS,
+                                  height=size * self.PREVIEW_CELLS)
+            self.previews[key] = image
+
+        # Fond transparent : l'image se superpose au tableau de score
+        image.blank()
+        for (dx, dy), color in cells.items():
+            self.blit(image, self.get_tile(canvas, size, color), dx * size, dy * size)
+
+        canvas.create_image(origin_x, origin_y, image=image, anchor="nw")
+
+RENDERERS = {
+    'canvas': CanvasRenderer,
+    'photo': PhotoImageRenderer
+}
+RENDERER = 'canvas'  # Mettre 'photo' pour un grand BLOCK_SIZE ou de nombreuses grilles
+
 # Classe principale du jeu
 class TetrisGame:
-    def __init__(self, master):
+    def __init__(self, master, renderer: Optional[Renderer] = None):
         self.master = master
+        self.renderer = renderer if renderer else RENDERERS[RENDERER]()
         master.title("Tetris à deux joueurs (Humain vs IA)")
         master.geometry(f"{GAME_WIDTH}x{GAME_HEIGHT}")
         master.resizable(False, False)
@@ -128,6 +365,9 @@ class TetrisGame:
         self.current_pieces = {'human': None, 'ai': None}
         self.next_pieces = {'human': None, 'ai': None}
         
+        # Dernières grilles figées, pour partager les rangées entre instantanés
+        self.frozen_grids = {'human': None, 'ai': None}
+        
         # Interface graphique
         self.setup_ui()
         
@@ -230,22 +470,19 @@ class TetrisGame:
     # Taille de bloc réduite pour la prévisualisation
         block_size = BLOCK_SIZE / 2  # Diminuer davantage la taille des blocs
     
+        cells = {}
         for dx, dy in SHAPES[piece.shape_type][0]:
-            x1 = center_x + dx * block_size
-            y1 = center_y + dy * block_size
-            x2 = x1 + block_size
-            y2 = y1 + block_size
-        
             if self.rainbow_mode:
                 color = random.choice(list(COLORS.values()))
-        
-            self.canvas_score.create_rectangle(x1, y1, x2, y2, fill=color, outline="white")
+            cells[(dx, dy)] = color
+    
+        self.renderer.draw_preview(self.canvas_score, player, cells, center_x, center_y, block_size)
     
     def draw_grid(self, player):
         canvas = self.canvas_human if player == 'human' else self.canvas_ai
         grid = self.grids[player]
         
-        canvas.delete("all")
+        cells = {}
         
         # Dessiner les blocs fixes
         for y in range(GRID_HEIGHT):
@@ -254,7 +491,7 @@ class TetrisGame:
                     color = grid[y][x]
                     if self.rainbow_mode:
                         color = random.choice(list(COLORS.values()))
-                    self.draw_block(canvas, x, y, color)
+                    cells[(x, y)] = color
         
         # Dessiner la pièce courante
         if self.current_pieces[player]:
@@ -265,16 +502,10 @@ class TetrisGame:
                 color = random.choice(list(COLORS.values()))
             
             for x, y in piece.get_blocks():
-                if 0 <= y < GRID_HEIGHT:  # Ne dessiner que les blocs visibles
-                    self.draw_block(canvas, x, y, color)
-    
-    def draw_block(self, canvas, x, y, color):
-        x1 = x * BLOCK_SIZE
-        y1 = y * BLOCK_SIZE
-        x2 = x1 + BLOCK_SIZE
-        y2 = y1 + BLOCK_SIZE
+                if 0 <= y < GRID_HEIGHT and 0 <= x < GRID_WIDTH:  # Ne dessiner que les blocs visibles
+                    cells[(x, y)] = color
         
-        canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="white")
+        self.renderer.draw_board(canvas, cells)
     
     def start_game(self):
         # Générer les premières pièces
@@ -366,23 +597,8 @@ class TetrisGame:
             pass
     
     def check_collision(self, player):
-        piece = self.current_pieces[player]
-        grid = self.grids[player]
-        
-        for x, y in piece.get_blocks():
-            # Vérifier les limites horizontales
-            if x < 0 or x >= GRID_WIDTH:
-                return True
-            
-            # Vérifier la limite inférieure
-            if y >= GRID_HEIGHT:
-                return True
-            
-            # Vérifier la collision avec des blocs existants
-            if y >= 0 and grid[y][x]:  # Ignorer les collisions au-dessus de la grille
-                return True
-        
-        return False
+        # Limites de la grille et blocs existants
+        return grid_collides(self.grids[player], self.current_pieces[player].get_blocks())
     
     def lock_piece(self, player):
         piece = self.current_pieces[player]
@@ -430,19 +646,12 @@ class TetrisGame:
             self.lines_cleared[player] += lines_cleared
             
             # Calculer les points
-            points = 0
-            if lines_cleared == 1:
-                points = 50
-            elif lines_cleared == 2:
-                points = 50 * 2 + 100  # 200 points
+            points = line_clear_points(lines_cleared)
+            if lines_cleared == 2:
                 # Donner une pièce facile à l'adversaire
                 opponent = 'ai' if player == 'human' else 'human'
                 if self.next_pieces[opponent]:
                     self.next_pieces[opponent] = Piece(random.choice(['I', 'O']), 0, 0, 0)
-            elif lines_cleared == 3:
-                points = 50 * 3 + 200  # 350 points
-            elif lines_cleared == 4:
-                points = 50 * 4 + 300  # 500 points
             
             # Bonus pour pièce spéciale bien placée
             if self.current_pieces[player] and self.current_pieces[player].is_special:
@@ -500,46 +709,26 @@ class TetrisGame:
         best_rotation = 0
         best_x = 0
         
-        # Copier la grille actuelle pour les simulations
-        grid_copy = copy.deepcopy(self.grids['ai'])
+        # Figer la grille actuelle pour les simulations (sans copie profonde)
+        grid = self.freeze_grid('ai')
         
-        # Tester chaque rotation possible
+        # Tester chaque rotation et chaque position x possibles
         for rotation in range(len(SHAPES[piece.shape_type])):
-            # Sauvegarder la rotation originale
-            original_rotation = piece.rotation
-            piece.rotation = rotation
-            
-            # Tester chaque position x possible
             for x in range(-2, GRID_WIDTH):
-                # Sauvegarder la position originale
-                original_x, original_y = piece.x, piece.y
-                piece.x = x
-                piece.y = 0
+                candidate = PieceState(piece.shape_type, rotation, x, 0, piece.is_special)
                 
                 # Vérifier si la position est valide
-                if not self.check_collision('ai'):
-                    # Simuler la chute
-                    y = 0
-                    while True:
-                        piece.y = y
-                        if self.check_collision('ai'):
-                            piece.y = y - 1
-                            break
-                        y += 1
-                    
-                    # Évaluer cette position
-                    score = self.evaluate_position(piece, grid_copy)
-                    
-                    if score > best_score:
-                        best_score = score
-                        best_rotation = rotation
-                        best_x = x
+                if grid_collides(grid, candidate.get_blocks()):
+                    continue
                 
-                # Restaurer la position originale
-                piece.x, piece.y = original_x, original_y
-            
-            # Restaurer la rotation originale
-            piece.rotation = original_rotation
+                # Simuler la chute puis évaluer cette position
+                candidate = replace(candidate, y=landing_y(grid, candidate))
+                score = self.evaluate_position(candidate, grid)
+                
+                if score > best_score:
+                    best_score = score
+                    best_rotation = rotation
+                    best_x = x
         
         # Appliquer le meilleur mouvement
         piece.rotation = best_rotation
@@ -558,12 +747,8 @@ class TetrisGame:
         # Une heuristique simple pour évaluer une position
         # Critères : hauteur, trous, lignes complétées, etc.
         
-        # Créer une copie de la grille avec la pièce placée
-        temp_grid = copy.deepcopy(grid)
-        
-        for x, y in piece.get_blocks():
-            if 0 <= y < GRID_HEIGHT and 0 <= x < GRID_WIDTH:
-                temp_grid[y][x] = COLORS[piece.shape_type]
+        # Créer une copie de la grille avec la pièce placée (seules les rangées touchées sont copiées)
+        temp_grid = place_blocks(grid, piece.get_blocks(), COLORS[piece.shape_type])
         
         # Compter les lignes complètes
         complete_lines = 0
@@ -628,6 +813,57 @@ class TetrisGame:
         
         return score
     
+    def freeze_grid(self, player) -> Grid:
+        self.frozen_grids[player] = freeze_grid(self.grids[player], self.frozen_grids[player])
+        return self.frozen_grids[player]
+    
+    def snapshot(self) -> GameSnapshot:
+        boards = {}
+        for player in ['human', 'ai']:
+            boards[player] = BoardState(
+                self.freeze_grid(player),
+                PieceState.from_piece(self.current_pieces[player]),
+                PieceState.from_piece(self.next_pieces[player]),
+                self.scores[player],
+                self.lines_cleared[player]
+            )
+        
+        return GameSnapshot(
+            human=boards['human'],
+            ai=boards['ai'],
+            game_over=self.game_over,
+            rainbow_mode=self.rainbow_mode,
+            rainbow_end_time=self.rainbow_end_time,
+            slow_mode=self.slow_mode,
+            slow_end_time=self.slow_end_time,
+            fall_speed=self.fall_speed,
+            fall_speed_ai=self.fall_speed_ai
+        )
+    
+    def restore(self, snapshot: GameSnapshot):
+        # Revenir à un état capturé par snapshot() (annulation, retour en arrière)
+        for player in ['human', 'ai']:
+            board = snapshot.board(player)
+            self.grids[player] = [list(row) for row in board.grid]
+            self.frozen_grids[player] = board.grid
+            self.current_pieces[player] = board.current.to_piece() if board.current else None
+            self.next_pieces[player] = board.next.to_piece() if board.next else None
+            self.scores[player] = board.score
+            self.lines_cleared[player] = board.lines_cleared
+        
+        self.game_over = snapshot.game_over
+        self.rainbow_mode = snapshot.rainbow_mode
+        self.rainbow_end_time = snapshot.rainbow_end_time
+        self.slow_mode = snapshot.slow_mode
+        self.slow_end_time = snapshot.slow_end_time
+        self.fall_speed = snapshot.fall_speed
+        self.fall_speed_ai = snapshot.fall_speed_ai
+        
+        # Mettre à jour l'affichage
+        self.draw_grid('human')
+        self.draw_grid('ai')
+        self.draw_score_board()
+    
     def update(self):
         if not self.game_over and not self.paused:
             current_time = time.time()